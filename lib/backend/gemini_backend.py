@@ -1,20 +1,67 @@
+import time
+import threading
 import google.generativeai as genai
+from lib.backend.request_scheduler import (
+    INTERACTIVE,
+    estimate_gemini_tokens,
+    get_gemini_scheduler,
+)
 
+GEMINI_MODEL = "gemini-2.5-flash-preview-04-17"
 
-def query_gemini(prompt: str, file_bytes: bytes, mime_type: str) -> str:
+
+def query_gemini(
+    prompt: str,
+    file_bytes: bytes,
+    mime_type: str,
+    session_id: str = "default",
+    priority: int = INTERACTIVE,
+    cancel_event: threading.Event = None,
+    admitted_event: threading.Event = None,
+    model_name: str = GEMINI_MODEL,
+    timing: dict = None,
+) -> str:
     """
     Queries the Gemini API with a given prompt and file data to generate content.
 
+    The request is routed through the process-wide request scheduler, which waits for free
+    request and token quota instead of letting the API reject the call with HTTP 429.
+
     Args:
         prompt (str): The prompt to send to the model for processing.
         file_bytes (bytes): The file data to be processed by the model (e.g., image or PDF bytes).
         mime_type (str): The MIME type of the file (e.g., 'image/jpeg', 'application/pdf').
+        session_id (str, optional): Identifier of the requesting session, used for fair queuing. Defaults to "default".
+        priority (int, optional): Scheduling priority (INTERACTIVE or BATCH). Defaults to INTERACTIVE.
+        cancel_event (threading.Event, optional): Cancels the request while it is still waiting for quota.
+        admitted_event (threading.Event, optional): Set once the request has left the queue and is sent.
+        model_name (str, optional): The Gemini model to use. Defaults to GEMINI_MODEL.
+        timing (dict, optional): If given, 'latency' is set to the duration of the API call in seconds,
+            excluding the time spent waiting for quota.
 
     Returns:
         str: The generated response content from the Gemini model.
     """
-    model = genai.GenerativeModel("gemini-2.5-flash-preview-04-17")
-    response = model.generate_content(
-        [prompt, {"mime_type": mime_type, "data": file_bytes}]
+    model = genai.GenerativeModel(model_name)
+
+    def generate():
+        started = time.perf_counter()
+        response = model.generate_content(
+            [prompt, {"mime_type": mime_type, "data": file_bytes}]
+        )
+        if timing is not None:
+            timing["latency"] = time.perf_counter() - started
+        return response
+
+    response = get_gemini_scheduler().run(
+        generate,
+        session_id=session_id,
+        priority=priority,
+        tokens=estimate_gemini_tokens(prompt, file_bytes, mime_type),
+        cancel_event=cancel_event,
+        admitted_event=admitted_event,
+        actual_tokens=lambda response: getattr(
+            getattr(response, "usage_metadata", None), "total_token_count", None
+        ),
     )
     return response.text
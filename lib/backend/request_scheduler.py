@@ -0,0 +1,348 @@
+import io
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Optional, TypeVar
+from PIL import Image
+
+T = TypeVar("T")
+
+# Lower values are dispatched first
+INTERACTIVE = 0
+BATCH = 1
+
+# Token cost of one image tile or PDF page for Gemini models. Images with both sides up to
+# 384 px count as one tile, larger images are split into tiles of 768 x 768 px.
+GEMINI_TOKENS_PER_IMAGE = 258
+GEMINI_SMALL_IMAGE_SIDE = 384
+GEMINI_IMAGE_TILE_SIDE = 768
+# Reserved budget for the generated answer of a single request
+GEMINI_OUTPUT_TOKEN_ESTIMATE = 2048
+
+
+class RequestCancelled(Exception):
+    """Raised when a request is cancelled while waiting for a free slot."""
+
+
+class SlidingWindowLimit:
+    """
+    Limits the amount admitted within any window of `period` seconds.
+
+    Every admission is logged with its time and amount; a new amount is only admitted if the
+    sum over the last `period` seconds including it stays at or below `limit`. Unlike a token
+    bucket, this never lets more than `limit` through in a single window.
+
+    Args:
+        limit (float): Maximum amount per window.
+        period (float): Length of the window in seconds. Defaults to 60.
+        clock (Callable[[], float]): Monotonic time source. Defaults to time.monotonic.
+    """
+
+    def __init__(
+        self,
+        limit: float,
+        period: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.limit = float(limit)
+        self.period = period
+        self.clock = clock
+        self.log = deque()  # [admit_time, amount] entries, oldest first
+        self.blocked_until = float("-inf")
+
+    def _expire(self, now: float):
+        while self.log and self.log[0][0] <= now - self.period:
+            self.log.popleft()
+
+    def wait_time(self, amount: float) -> float:
+        """Returns the number of seconds until `amount` fits into the window (0 if it fits now)."""
+        now = self.clock()
+        self._expire(now)
+        blocked = max(0.0, self.blocked_until - now)
+        excess = sum(entry[1] for entry in self.log) + min(amount, self.limit)
+        excess -= self.limit
+        if excess <= 0:
+            return blocked
+        for admitted, used in self.log:
+            excess -= used
+            if excess <= 0:
+                return max(blocked, admitted + self.period - now)
+        return blocked
+
+    def consume(self, amount: float) -> list:
+        """Logs `amount` (capped at the limit) as admitted now and returns the log entry."""
+        entry = [self.clock(), min(amount, self.limit)]
+        self.log.append(entry)
+        return entry
+
+    def block(self, seconds: float):
+        """Admits nothing for the next `seconds`."""
+        self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+
+
+class _Ticket:
+    def __init__(self, session_id: str, priority: int, tokens: int):
+        self.session_id = session_id
+        self.priority = priority
+        self.tokens = tokens
+
+
+class RequestScheduler:
+    """
+    Process-wide scheduler that admits backend requests within per-minute request and token quotas.
+
+    Waiting requests are queued per priority (INTERACTIVE before BATCH) and the least recently
+    served session goes first within a priority, so a single batch run cannot crowd out other users.
+    Instead of failing, callers block until their request fits into both quotas; requests that
+    are still rejected with HTTP 429 are retried after a backoff. Both quotas are enforced over a
+    sliding 60 s window, so no minute ever sees more than the configured limits.
+
+    Args:
+        requests_per_minute (int): Maximum number of requests per minute.
+        tokens_per_minute (int): Maximum number of (estimated) tokens per minute.
+        clock (Callable[[], float]): Monotonic time source, replaceable by a fake clock in tests.
+        max_retries (int): How often a request rejected with HTTP 429 is retried. Defaults to 3.
+        retry_backoff (float): Seconds the quota is blocked after a 429 response. Defaults to 10.
+        poll_interval (float): Maximum real time in seconds a waiting caller sleeps before
+            re-checking the clock. Defaults to 1.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        clock: Callable[[], float] = time.monotonic,
+        max_retries: int = 3,
+        retry_backoff: float = 10.0,
+        poll_interval: float = 1.0,
+    ):
+        self.clock = clock
+        self.request_limit = SlidingWindowLimit(requests_per_minute, clock=clock)
+        self.token_limit = SlidingWindowLimit(tokens_per_minute, clock=clock)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.poll_interval = poll_interval
+        self._queues = {}  # priority -> OrderedDict(session_id -> deque of tickets)
+        self._last_served = {}  # session_id -> sequence number of last admission
+        self._served = 0
+        self._cond = threading.Condition()
+
+    def _head(self) -> Optional[_Ticket]:
+        for priority in sorted(self._queues):
+            sessions = self._queues[priority]
+            if sessions:
+                # Least recently served session first, ties broken by arrival
+                session_id = min(
+                    sessions, key=lambda sid: self._last_served.get(sid, -1)
+                )
+                return sessions[session_id][0]
+        return None
+
+    def _enqueue(self, ticket: _Ticket):
+        sessions = self._queues.setdefault(ticket.priority, OrderedDict())
+        sessions.setdefault(ticket.session_id, deque()).append(ticket)
+
+    def _dequeue(self, ticket: _Ticket, served: bool):
+        sessions = self._queues[ticket.priority]
+        queue = sessions[ticket.session_id]
+        queue.remove(ticket)
+        if not queue:
+            del sessions[ticket.session_id]
+        if served:
+            self._served += 1
+            self._last_served[ticket.session_id] = self._served
+
+    def pending(self) -> int:
+        """Returns the number of requests currently waiting for a slot."""
+        with self._cond:
+            return sum(
+                len(queue)
+                for sessions in self._queues.values()
+                for queue in sessions.values()
+            )
+
+    def wake(self):
+        """Wakes up waiting callers, e.g. after a fake clock has been advanced."""
+        with self._cond:
+            self._cond.notify_all()
+
+    def acquire(
+        self,
+        session_id: str = "default",
+        priority: int = INTERACTIVE,
+        tokens: int = 0,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> list:
+        """
+        Blocks until the request may be sent and reserves its share of both quotas.
+
+        Setting `cancel_event` takes effect immediately if it is followed by `wake()`,
+        otherwise within `poll_interval` seconds.
+
+        Args:
+            session_id (str): Identifier of the requesting session, used for fair queuing.
+            priority (int): INTERACTIVE or BATCH. Defaults to INTERACTIVE.
+            tokens (int): Estimated number of tokens the request consumes.
+            cancel_event (threading.Event, optional): If set while waiting, the request is
+                removed from the queue and RequestCancelled is raised.
+
+        Returns:
+            list: The token log entry of the request, used to correct its token usage.
+
+        Raises:
+            RequestCancelled: If `cancel_event` was set before the request was admitted.
+        """
+        ticket = _Ticket(session_id, priority, tokens)
+        with self._cond:
+            self._enqueue(ticket)
+            try:
+                while True:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise RequestCancelled()
+                    timeout = self.poll_interval
+                    if self._head() is ticket:
+                        wait = max(
+                            self.request_limit.wait_time(1),
+                            self.token_limit.wait_time(tokens),
+                        )
+                        if wait <= 0:
+                            self.request_limit.consume(1)
+                            entry = self.token_limit.consume(tokens)
+                            self._dequeue(ticket, served=True)
+                            return entry
+                        timeout = min(wait, self.poll_interval)
+                    self._cond.wait(timeout)
+            except BaseException:
+                self._dequeue(ticket, served=False)
+                raise
+            finally:
+                self._cond.notify_all()
+
+    def penalize(self, seconds: float):
+        """Admits no request for `seconds`, e.g. after the backend answered with HTTP 429."""
+        with self._cond:
+            self.request_limit.block(seconds)
+            self.token_limit.block(seconds)
+
+    def run(
+        self,
+        request: Callable[[], T],
+        session_id: str = "default",
+        priority: int = INTERACTIVE,
+        tokens: int = 0,
+        cancel_event: Optional[threading.Event] = None,
+        actual_tokens: Optional[Callable[[T], Optional[int]]] = None,
+        admitted_event: Optional[threading.Event] = None,
+    ) -> T:
+        """
+        Executes `request` as soon as it fits into the quotas and returns its result.
+
+        Rate limit errors (HTTP 429) of the backend are retried up to `max_retries` times;
+        all other exceptions are passed through unchanged.
+
+        Args:
+            request (Callable[[], T]): The backend call to execute.
+            session_id (str): Identifier of the requesting session. Defaults to "default".
+            priority (int): INTERACTIVE or BATCH. Defaults to INTERACTIVE.
+            tokens (int): Estimated number of tokens the request consumes.
+            cancel_event (threading.Event, optional): Cancels the request while it is waiting.
+            actual_tokens (Callable[[T], Optional[int]], optional): Reads the real token usage from
+                the result. The token quota is corrected by the difference to the estimate.
+            admitted_event (threading.Event, optional): Set as soon as the request is admitted and sent.
+
+        Returns:
+            T: The return value of `request`.
+        """
+        for attempt in range(self.max_retries + 1):
+            entry = self.acquire(session_id, priority, tokens, cancel_event)
+            if admitted_event is not None:
+                admitted_event.set()
+            try:
+                result = request()
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                self.penalize(self.retry_backoff * (attempt + 1))
+                continue
+
+            used = actual_tokens(result) if actual_tokens is not None else None
+            if used is not None:
+                self.correct_tokens(entry, used)
+            return result
+
+    def correct_tokens(self, entry: list, actual: int):
+        """Replaces the estimated token usage of an admitted request with its actual usage."""
+        with self._cond:
+            entry[1] = actual
+            self._cond.notify_all()
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Returns True if the exception signals an exceeded quota (HTTP 429)."""
+    code = getattr(error, "code", None)
+    if callable(code):
+        # gRPC errors expose the status code as a method
+        code = code()
+    return code == 429 or getattr(code, "name", None) == "RESOURCE_EXHAUSTED"
+
+
+def estimate_gemini_tokens(prompt: str, file_bytes: bytes, mime_type: str) -> int:
+    """
+    Estimates the number of tokens a Gemini request consumes.
+
+    Args:
+        prompt (str): The prompt sent to the model.
+        file_bytes (bytes): The attached image or PDF.
+        mime_type (str): The MIME type of the attachment.
+
+    Returns:
+        int: Estimated prompt, attachment and output tokens.
+    """
+    if mime_type == "application/pdf":
+        tiles = max(
+            1, file_bytes.count(b"/Type /Page") - file_bytes.count(b"/Type /Pages")
+        )
+    else:
+        tiles = _count_image_tiles(file_bytes)
+    return (
+        len(prompt) // 4
+        + tiles * GEMINI_TOKENS_PER_IMAGE
+        + GEMINI_OUTPUT_TOKEN_ESTIMATE
+    )
+
+
+def _count_image_tiles(file_bytes: bytes) -> int:
+    try:
+        # Only the image header is read to determine the size
+        width, height = Image.open(io.BytesIO(file_bytes)).size
+    except Exception:
+        # Unknown format: assume a large photo of a planner page
+        width = height = 4 * GEMINI_IMAGE_TILE_SIDE
+    if max(width, height) <= GEMINI_SMALL_IMAGE_SIDE:
+        return 1
+    return math.ceil(width / GEMINI_IMAGE_TILE_SIDE) * math.ceil(
+        height / GEMINI_IMAGE_TILE_SIDE
+    )
+
+
+_gemini_scheduler = None
+_gemini_scheduler_lock = threading.Lock()
+
+
+def get_gemini_scheduler() -> RequestScheduler:
+    """
+    Returns the process-wide scheduler for Gemini requests.
+
+    The quotas are read from the environment variables 'GEMINI_REQUESTS_PER_MINUTE'
+    and 'GEMINI_TOKENS_PER_MINUTE' on first use.
+    """
+    global _gemini_scheduler
+    with _gemini_scheduler_lock:
+        if _gemini_scheduler is None:
+            _gemini_scheduler = RequestScheduler(
+                requests_per_minute=int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "10")),
+                tokens_per_minute=int(os.getenv("GEMINI_TOKENS_PER_MINUTE", "250000")),
+            )
+        return _gemini_scheduler
@@ -4,6 +4,7 @@ from dotenv import load_dotenv
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 import streamlit as st
+from lib.utils.compress_recurring_events import compress_recurring_events
 
 load_dotenv()
 
@@ -45,11 +46,22 @@ class CalendarManager:
         """
         return self.calendar_category_map.get(category)
 
-    def upload_calendar_events(self):
+    def upload_calendar_events(
+        self,
+        compress_recurring: bool = False,
+        key: str = "parsed_events",
+        exclude: list[int] = None,
+    ) -> bool:
         """
-        Uploads calendar events stored in Streamlit's session state ('parsed_events')
+        Uploads calendar events stored in Streamlit's session state (by default 'parsed_events')
         to the appropriate Google Calendars based on their categories.
 
+        Args:
+            compress_recurring (bool): If True, repeated events (same summary, category and time
+                on several days) are uploaded as a single recurring event. Defaults to False.
+            key (str): The session state key of the events to upload. Defaults to "parsed_events".
+            exclude (list[int], optional): Indices of events that must not be uploaded.
+
         Uses a Google service account specified by the environment variable
         'CALENDAR_SERVICE_ACCOUNT_FILE_PATH' to authenticate with the Google Calendar API.
 
@@ -57,25 +69,36 @@ class CalendarManager:
         If no calendar ID is found for a category, the event is skipped.
 
         Provides Streamlit UI feedback (success, warning, or error messages) during the process.
+
+        Returns:
+            bool: True if every event was inserted, False otherwise.
         """
         service_account_path = os.getenv("CALENDAR_SERVICE_ACCOUNT_FILE_PATH")
-        events = st.session_state.get("parsed_events", [])
+        events = [
+            event
+            for idx, event in enumerate(st.session_state.get(key, []))
+            if idx not in (exclude or [])
+        ]
 
         if not service_account_path:
             st.error("❌ Fehlende Umgebungsvariablen für Google Calendar.")
-            return
+            return False
 
         if not events:
             st.warning("⚠️ Keine Ereignisse zum Synchronisieren.")
-            return
+            return False
 
         try:
+            if compress_recurring:
+                events = compress_recurring_events(events)
+
             credentials = service_account.Credentials.from_service_account_file(
                 service_account_path,
                 scopes=["https://www.googleapis.com/auth/calendar"],
             )
             service = build("calendar", "v3", credentials=credentials)
 
+            uploaded = True
             for idx, event in enumerate(events):
                 try:
                     # Remove 'id' to avoid conflicts and duplicates on insert
@@ -86,6 +109,7 @@ class CalendarManager:
                         st.warning(
                             f"⚠️ Kein Kalender für Kategorie '{category}' gefunden. Ereignis wird übersprungen."
                         )
+                        uploaded = False
                         continue
                     event.pop("category", None)
                     service.events().insert(
@@ -93,10 +117,14 @@ class CalendarManager:
                     ).execute()
                     st.success(
                         f"✅ Termin `{event['summary']}` erfolgreich synchronisiert."
+                        + (" (wiederkehrend)" if "recurrence" in event else "")
                     )
                 except Exception as e:
                     st.error(
                         f"❌ Fehler bei Termin `{event.get('summary', 'Unbekannt')}`: {e}"
                     )
+                    uploaded = False
+            return uploaded
         except Exception as e:
             st.error(f"❌ Verbindung zu Google Calendar fehlgeschlagen: {e}")
+            return False
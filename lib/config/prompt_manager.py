@@ -7,17 +7,8 @@ class PromptManager:
     def __init__(self):
         """Initializes the PromptManager with predefined prompts."""
 
-        # Define the prompt for reading calendar layout
-        self.calendar = (
-            "Bitte lies den handgeschriebenen Text auf dem Bild einer Tagesplaner-Seite sorgfältig und so genau wie "
-            "möglich.\n\n"
-            "### Deine Aufgabe:\n"
-            "Extrahiere alle relevanten Informationen aus dem Bild und strukturiere sie wie folgt:\n\n"
-            "1. Alle **Termine oder Ereignisse** aus dem Zeitplan (inkl. Beschreibung und Notizen).\n"
-            "2. **Start- und Endzeit** jedes Termins (so exakt wie möglich).\n"
-            "3. Verwende die Inhalte von der linken Seite (Titel + Beschreibung) für `summary` und `description`.\n"
-            "4. Ergänze ggf. passende Notizen von der rechten Seite in der `description`.\n"
-            "5. Gib jeden Termin im Format der **Google Calendar API** aus.\n\n"
+        # Event format and categories shared by the calendar prompts
+        event_format_and_categories = (
             "{\n"
             '    "summary": "Titel des Termins",\n'
             '    "location": "Ort (optional)",\n'
@@ -43,6 +34,32 @@ class PromptManager:
             "- **Termine**: Geplante Meetings, Verabredungen oder feste Ereignisse mit einem festen Zeitpunkt.\n"
         )
 
+        # Define the prompt for reading calendar layout
+        self.calendar = (
+            "Bitte lies den handgeschriebenen Text auf dem Bild einer Tagesplaner-Seite sorgfältig und so genau wie "
+            "möglich.\n\n"
+            "### Deine Aufgabe:\n"
+            "Extrahiere alle relevanten Informationen aus dem Bild und strukturiere sie wie folgt:\n\n"
+            "1. Alle **Termine oder Ereignisse** aus dem Zeitplan (inkl. Beschreibung und Notizen).\n"
+            "2. **Start- und Endzeit** jedes Termins (so exakt wie möglich).\n"
+            "3. Verwende die Inhalte von der linken Seite (Titel + Beschreibung) für `summary` und `description`.\n"
+            "4. Ergänze ggf. passende Notizen von der rechten Seite in der `description`.\n"
+            "5. Gib jeden Termin im Format der **Google Calendar API** aus.\n\n"
+        ) + event_format_and_categories
+
+        # Define the prompt for reading a week-at-a-glance spread with one column per day
+        self.week_calendar = (
+            "Bitte lies den handgeschriebenen Text auf dem Bild einer Wochenplaner-Doppelseite sorgfältig und so "
+            "genau wie möglich. Die Seite zeigt sieben Spalten, eine für jeden Wochentag von Montag bis Sonntag.\n\n"
+            "### Deine Aufgabe:\n"
+            "Extrahiere alle relevanten Informationen aus allen sieben Spalten und strukturiere sie wie folgt:\n\n"
+            "1. Alle **Termine oder Ereignisse** jeder Spalte (inkl. Beschreibung und Notizen).\n"
+            "2. Das **Datum** jedes Termins ergibt sich aus der Spalte, in der er steht. Verwende dafür die unten "
+            "angegebene Zuordnung von Spalten zu Daten.\n"
+            "3. **Start- und Endzeit** jedes Termins (so exakt wie möglich).\n"
+            "4. Gib alle Termine der Woche gemeinsam als eine JSON-Liste im Format der **Google Calendar API** aus.\n\n"
+        ) + event_format_and_categories
+
         # Define the prompt for reading text on an image
         self.readText = (
             "Lies die handgeschriebenen Notizen und Aufgaben in diesem Bild und liste diese auf.\n"
@@ -66,6 +83,7 @@ class PromptManager:
 
         self.prompt_map = {
             "Calendar": self.calendar,
+            "Week Planner": self.week_calendar,
             "Read Text": self.readText,
             "Summary": self.summary,
             "Describe Image": self.describe,
@@ -1,4 +1,5 @@
 import json
+import copy
 from typing import List, Dict, Optional
 import datetime
 import streamlit as st
@@ -180,12 +181,130 @@ class EventManager:
                     )
                     st.success(f"✅ Eintrag {idx + 1} wurde aktualisiert.")
 
-    def render_upload_button(self):
+    def find_events_outside(
+        self, first_day: datetime.date, last_day: datetime.date
+    ) -> List[int]:
+        """
+        Returns the indices of all parsed events that do not lie completely within the given days.
+        Events without a parsable start or end are reported as well.
+
+        Args:
+            first_day (datetime.date): The first allowed day.
+            last_day (datetime.date): The last allowed day.
+
+        Returns:
+            List[int]: Indices into 'parsed_events' of the events outside the range.
+        """
+        outside = []
+        for idx, event in enumerate(st.session_state.get("parsed_events", [])):
+            try:
+                start = datetime.datetime.fromisoformat(event["start"]["dateTime"])
+                end = datetime.datetime.fromisoformat(event["end"]["dateTime"])
+            except (KeyError, TypeError, ValueError):
+                outside.append(idx)
+                continue
+            if not (first_day <= start.date() and end.date() <= last_day):
+                outside.append(idx)
+        return outside
+
+    def render_week_validation(self, week_start: datetime.date) -> List[int]:
+        """
+        Renders a warning for every parsed event that does not fall into the selected week.
+
+        Args:
+            week_start (datetime.date): The Monday of the selected week.
+
+        Returns:
+            List[int]: Indices of the events outside the week.
+        """
+        week_end = week_start + datetime.timedelta(days=6)
+        outside = self.find_events_outside(week_start, week_end)
+        for idx in outside:
+            event = st.session_state["parsed_events"][idx]
+            st.warning(
+                f"⚠️ Ereignis #{idx + 1} `{event.get('summary', 'Ohne Titel')}` liegt nicht in der Woche "
+                f"{week_start.strftime('%d.%m.')} – {week_end.strftime('%d.%m.%Y')}."
+            )
+        return outside
+
+    def collect_events(
+        self, key: str = "collected_events", exclude: Optional[List[int]] = None
+    ):
+        """
+        Adds a copy of the current events to the collection of several extractions
+        (e.g. the pages of a whole week), so they can be uploaded together.
+        Events already in the collection (same summary, start and end) are skipped,
+        so collecting the same page twice does not duplicate them.
+
+        Args:
+            key (str): The session state key of the collection. Defaults to "collected_events".
+            exclude (List[int], optional): Indices of current events that are not collected.
+        """
+
+        def identity(event: Dict) -> tuple:
+            return (
+                event.get("summary"),
+                event.get("start", {}).get("dateTime"),
+                event.get("end", {}).get("dateTime"),
+            )
+
+        collected = st.session_state.setdefault(key, [])
+        seen = {identity(event) for event in collected}
+        for idx, event in enumerate(st.session_state.get("parsed_events", [])):
+            if idx in (exclude or []) or identity(event) in seen:
+                continue
+            seen.add(identity(event))
+            collected.append(copy.deepcopy(event))
+
+    def render_upload_button(self, invalid: Optional[List[int]] = None):
         """
         Renders a button to upload current events to Google Calendar.
+        Repeated events can optionally be combined into recurring events before the upload.
+
+        Events of several extractions can be collected first and uploaded together,
+        so that routines repeated across pages are recognized as recurring events.
+
+        Args:
+            invalid (List[int], optional): Indices of events that failed validation (e.g. outside
+                the selected week). They are only uploaded or collected after explicit confirmation.
         """
+        compress_recurring = st.checkbox(
+            "🔁 Wiederkehrende Termine zusammenfassen",
+            value=True,
+            key="compress_recurring",
+        )
+        exclude = None
+        if invalid and not st.checkbox(
+            f"⚠️ {len(invalid)} Termine außerhalb des gewählten Zeitraums trotzdem übernehmen",
+            value=False,
+            key="include_invalid_events",
+        ):
+            exclude = invalid
+
         if st.button("🔄 Mit Kalender synchronisieren"):
-            self.calendar_manager.upload_calendar_events()
+            self.calendar_manager.upload_calendar_events(
+                compress_recurring=compress_recurring, exclude=exclude
+            )
+
+        if st.button("📥 Termine dieser Seite sammeln"):
+            self.collect_events(exclude=exclude)
+
+        collected = st.session_state.get("collected_events", [])
+        if collected:
+            st.info(f"ℹ️ {len(collected)} Termine gesammelt.")
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button(
+                    "🔄 Gesammelte Termine synchronisieren"
+                ) and self.calendar_manager.upload_calendar_events(
+                    compress_recurring=compress_recurring, key="collected_events"
+                ):
+                    # Synchronized events must not be uploaded again with the next collection
+                    st.session_state.pop("collected_events", None)
+            with col2:
+                if st.button("🗑️ Sammlung leeren"):
+                    st.session_state.pop("collected_events", None)
+                    st.rerun()
 
     def render_json_block(self):
         """
@@ -14,18 +14,25 @@ class ImageProcessor:
     def __init__(self, uploaded_file):
         self.uploaded_file = uploaded_file
 
-    def image_to_base64(self, image: Image.Image) -> tuple[bytes, str]:
+    def image_to_base64(
+        self, image: Image.Image, max_side: int = None, quality: int = 75
+    ) -> tuple[bytes, str]:
         """
         Converts an image to base64 encoded string.
 
         Args:
             image (Image.Image): The image to be converted.
+            max_side (int, optional): If set, the image is downscaled so that its longer side is at most this many pixels.
+            quality (int, optional): JPEG quality from 1 to 95. Defaults to 75.
 
         Returns:
             tuple: A tuple containing the base64 encoded bytes and the MIME type ('image/jpeg').
         """
+        if max_side and max(image.size) > max_side:
+            image = image.copy()
+            image.thumbnail((max_side, max_side), Image.LANCZOS)
         buffer = io.BytesIO()
-        image.save(buffer, format="JPEG")
+        image.save(buffer, format="JPEG", quality=quality)
         return buffer.getvalue(), "image/jpeg"
 
     def process_file(
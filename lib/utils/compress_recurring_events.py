@@ -0,0 +1,144 @@
+import copy
+import datetime
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+
+def _parse_start_end(
+    event: Dict,
+) -> Optional[Tuple[datetime.datetime, datetime.datetime]]:
+    try:
+        start = datetime.datetime.fromisoformat(event["start"]["dateTime"])
+        end = datetime.datetime.fromisoformat(event["end"]["dateTime"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    # Edited events are stored without UTC offset, model output carries one.
+    # Recurrences are defined in wall-clock time of the event's time zone.
+    return start.replace(tzinfo=None), end.replace(tzinfo=None)
+
+
+def _pattern_key(event: Dict, start: datetime.datetime, end: datetime.datetime):
+    """
+    Builds the key under which repeated instances of the same routine are grouped.
+    Description and location are part of the key, so instances with different notes are never merged.
+    """
+    return (
+        str(event.get("summary", "")).strip().casefold(),
+        str(event.get("description", "")).strip(),
+        str(event.get("location", "")).strip(),
+        event.get("category", "Termine"),
+        event["start"].get("timeZone", "Europe/Berlin"),
+        start.time(),
+        end - start,
+    )
+
+
+def _detect_frequency(
+    dates: List[datetime.date], min_occurrences: int
+) -> Optional[Tuple[str, int, List[datetime.date]]]:
+    """
+    Finds the recurrence rule (daily or weekly) that covers the given dates.
+
+    Returns:
+        tuple: The RRULE frequency, the number of generated occurrences (COUNT) and the
+               dates of the rule that have to be excluded via EXDATE.
+               Returns None if the dates do not form a recurring pattern.
+    """
+    if len(dates) < min_occurrences:
+        return None
+
+    first, last = dates[0], dates[-1]
+    candidates = [("DAILY", 1)]
+    if all(d.weekday() == first.weekday() for d in dates):
+        candidates.insert(0, ("WEEKLY", 7))
+
+    for freq, step in candidates:
+        span = (last - first).days // step + 1
+        # Only compress if most of the generated occurrences really took place
+        if span > 2 * len(dates):
+            continue
+        present = set(dates)
+        exdates = [
+            first + datetime.timedelta(days=i * step)
+            for i in range(span)
+            if first + datetime.timedelta(days=i * step) not in present
+        ]
+        return freq, span, exdates
+    return None
+
+
+def _build_recurring_event(
+    instances: List[Tuple[Dict, datetime.datetime, datetime.datetime]],
+    freq: str,
+    count: int,
+    exdates: List[datetime.date],
+) -> Dict:
+    template, start, end = instances[0]
+    event = copy.deepcopy(template)
+    event.pop("id", None)
+    timezone = event["start"].get("timeZone", "Europe/Berlin")
+    # Recurring events require an explicit time zone on start and end
+    event["start"]["timeZone"] = timezone
+    event.setdefault("end", {})["timeZone"] = timezone
+
+    recurrence = [f"RRULE:FREQ={freq};COUNT={count}"]
+    if exdates:
+        local_time = start.strftime("%H%M%S")
+        recurrence.append(
+            f"EXDATE;TZID={timezone}:"
+            + ",".join(f"{d.strftime('%Y%m%d')}T{local_time}" for d in exdates)
+        )
+    event["recurrence"] = recurrence
+    return event
+
+
+def compress_recurring_events(
+    events: List[Dict], min_occurrences: int = 3
+) -> List[Dict]:
+    """
+    Collapses repeated single events (e.g. daily "Routinen" or "Sport" entries extracted from
+    several planner pages) into one recurring event with an RRULE and EXDATEs.
+
+    Events are considered repetitions of each other if summary, description, location, category,
+    time zone, start time and duration match; exact duplicates on the same day are merged into one.
+    The category is kept on the compressed event, so it is routed through the category mapping of
+    the CalendarManager like any other event.
+
+    Args:
+        events (List[Dict]): Events in Google Calendar API format, as stored in 'parsed_events'.
+        min_occurrences (int): Minimum number of instances required to emit a recurring event. Defaults to 3.
+
+    Returns:
+        List[Dict]: New list with recurring events in place of their instances.
+                    The input events are not modified.
+    """
+    groups = defaultdict(list)
+    order = []
+    for idx, event in enumerate(events):
+        parsed = _parse_start_end(event) if "recurrence" not in event else None
+        if parsed is None:
+            order.append(("single", idx))
+            continue
+        key = _pattern_key(event, *parsed)
+        if key not in groups:
+            order.append(("group", key))
+        groups[key].append((event, *parsed))
+
+    compressed = []
+    for kind, value in order:
+        if kind == "single":
+            compressed.append(copy.deepcopy(events[value]))
+            continue
+
+        # Exact duplicates (e.g. the same page extracted twice) are merged into one instance
+        instances = {}
+        for event, start, end in sorted(groups[value], key=lambda i: i[1]):
+            instances.setdefault(start.date(), (event, start, end))
+        instances = list(instances.values())
+        dates = [start.date() for _, start, _ in instances]
+        pattern = _detect_frequency(dates, min_occurrences)
+        if pattern is None:
+            compressed.extend(copy.deepcopy(event) for event, _, _ in instances)
+        else:
+            compressed.append(_build_recurring_event(instances, *pattern))
+    return compressed
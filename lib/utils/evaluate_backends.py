@@ -0,0 +1,506 @@
+"""
+Accuracy-versus-latency evaluation of backends, models, prompts and image preprocessing settings.
+
+Runs every combination on a labeled set of planner images, scores the extracted events against
+the expected ones and prints a table of accuracy, latency and payload size with the Pareto-optimal
+configurations marked.
+
+Usage:
+    python -m lib.utils.evaluate_backends samples/manifest.json --backends gemini ollama \\
+        --max-sides 0 1024 --qualities 75 90 --record replay.json
+    python -m lib.utils.evaluate_backends samples/manifest.json --replay replay.json
+
+The manifest is a JSON list of labeled pages (paths are relative to the manifest). For week
+spreads, "date" may be any day of the week:
+    [{"image": "2025-05-12.jpg", "date": "2025-05-12",
+      "events": [{"summary": "Sport", "start": "2025-05-12T07:00:00", "end": "2025-05-12T08:00:00"}]}]
+"""
+
+import os
+import io
+import json
+import time
+import difflib
+import argparse
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+from PIL import Image
+from dotenv import load_dotenv
+from lib.backend.gemini_backend import GEMINI_MODEL, query_gemini
+from lib.backend.ollama_backend import query_ollama
+from lib.backend.request_scheduler import BATCH
+from lib.config.prompt_manager import PromptManager
+from lib.models.image import ImageProcessor
+from lib.utils.process_calendar_extraction import extract_json
+from lib.utils.select_date import format_date_prompt, format_week_prompt
+
+# Prompts that expect the date of the page as additional prompt component
+DATED_PROMPTS = {
+    "Calendar": format_date_prompt,
+    "Week Planner": lambda date: format_week_prompt(
+        date - datetime.timedelta(days=date.weekday())
+    ),
+}
+
+
+class EvaluationConfig(NamedTuple):
+    backend: str
+    model: str
+    prompt_name: str
+    max_side: int  # 0 keeps the original resolution
+    quality: int
+
+    def label(self) -> str:
+        resolution = f"{self.max_side}px" if self.max_side else "original"
+        return f"{self.backend}/{self.model} · {self.prompt_name} · {resolution} · q{self.quality}"
+
+
+class ReplayBackend:
+    """
+    Serves recorded model responses and latencies instead of querying a backend,
+    so the evaluation can run in CI without Gemini or a local Ollama server.
+
+    Args:
+        path (str): JSON file written by a previous run with --record.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "r", encoding="utf-8") as f:
+            self.recordings = json.load(f)
+
+    def query(self, request_key: str) -> tuple[str, float]:
+        recording = self.recordings.get(request_key)
+        if recording is None:
+            raise KeyError(f"Keine Aufzeichnung für {request_key}")
+        return recording["response"], recording["latency"]
+
+    def models(self, backend: str) -> List[str]:
+        """Returns the models of the given backend that occur in the recordings."""
+        return sorted(
+            {
+                request_key.split("|")[1]
+                for request_key in self.recordings
+                if request_key.split("|")[0] == backend
+            }
+        )
+
+
+def _parse_datetime(value) -> Optional[datetime.datetime]:
+    if isinstance(value, dict):
+        value = value.get("dateTime")
+    try:
+        # Planner times are local wall-clock times, offsets are ignored
+        return datetime.datetime.fromisoformat(value).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_response_events(response: str) -> List[Dict]:
+    """Extracts the list of events from a raw model response (empty if none can be parsed)."""
+    json_text = extract_json(response or "")
+    if not json_text:
+        return []
+    try:
+        events = json.loads(json_text)
+    except json.JSONDecodeError:
+        return []
+    return [event for event in events if isinstance(event, dict)]
+
+
+def match_events(
+    predicted: List[Dict],
+    expected: List[Dict],
+    tolerance_minutes: float = 15,
+    min_similarity: float = 0.6,
+) -> int:
+    """
+    Counts the predicted events that match an expected event one-to-one.
+
+    Two events match if start and end differ by at most `tolerance_minutes` and the summaries are
+    similar enough. Candidate pairs are assigned greedily, closest in time first.
+
+    Args:
+        predicted (List[Dict]): Events extracted by the model.
+        expected (List[Dict]): Labeled events.
+        tolerance_minutes (float): Allowed deviation of start and end time. Defaults to 15.
+        min_similarity (float): Minimum summary similarity (0 to 1). Defaults to 0.6.
+
+    Returns:
+        int: Number of true positives.
+    """
+    tolerance = datetime.timedelta(minutes=tolerance_minutes)
+    candidates = []
+    for p_idx, p_event in enumerate(predicted):
+        p_start = _parse_datetime(p_event.get("start"))
+        p_end = _parse_datetime(p_event.get("end"))
+        if p_start is None:
+            continue
+        for e_idx, e_event in enumerate(expected):
+            e_start = _parse_datetime(e_event.get("start"))
+            e_end = _parse_datetime(e_event.get("end"))
+            if e_start is None or abs(p_start - e_start) > tolerance:
+                continue
+            if p_end and e_end and abs(p_end - e_end) > tolerance:
+                continue
+            similarity = difflib.SequenceMatcher(
+                None,
+                str(p_event.get("summary", "")).casefold(),
+                str(e_event.get("summary", "")).casefold(),
+            ).ratio()
+            if similarity < min_similarity:
+                continue
+            distance = abs(p_start - e_start) + (
+                abs(p_end - e_end) if p_end and e_end else datetime.timedelta()
+            )
+            candidates.append((distance, -similarity, p_idx, e_idx))
+
+    matched_predicted, matched_expected = set(), set()
+    for _, _, p_idx, e_idx in sorted(candidates):
+        if p_idx not in matched_predicted and e_idx not in matched_expected:
+            matched_predicted.add(p_idx)
+            matched_expected.add(e_idx)
+    return len(matched_predicted)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Returns the q-th percentile (0 to 100) of the values using the nearest-rank method."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def pareto_front(rows: List[Dict]) -> None:
+    """
+    Marks every row that is not dominated by another one in F1, p50 and p95 latency and payload size
+    by setting its 'pareto' field.
+    """
+    metrics = [("f1", 1), ("p50", -1), ("p95", -1), ("payload", -1)]
+
+    def dominates(a, b):
+        not_worse = all(sign * a[m] >= sign * b[m] for m, sign in metrics)
+        better = any(sign * a[m] > sign * b[m] for m, sign in metrics)
+        return not_worse and better
+
+    for row in rows:
+        row["pareto"] = row["errors"] < row["samples"] and not any(
+            dominates(other, row)
+            for other in rows
+            if other is not row and other["errors"] < other["samples"]
+        )
+
+
+class BackendEvaluator:
+    """
+    Runs and scores all combinations of backend, model, prompt and preprocessing settings.
+
+    Args:
+        samples (List[Dict]): Labeled pages from the manifest, with absolute image paths.
+        configs (List[EvaluationConfig]): Configurations to evaluate.
+        tolerance_minutes (float): Allowed time deviation for a matching event. Defaults to 15.
+        workers (int): Number of requests executed in parallel. Defaults to 4.
+        replay (ReplayBackend, optional): Serves recorded responses instead of querying the backends.
+    """
+
+    def __init__(
+        self,
+        samples: List[Dict],
+        configs: List[EvaluationConfig],
+        tolerance_minutes: float = 15,
+        workers: int = 4,
+        replay: Optional[ReplayBackend] = None,
+    ):
+        self.samples = samples
+        self.configs = configs
+        self.tolerance_minutes = tolerance_minutes
+        self.workers = workers
+        self.replay = replay
+        self.prompt_manager = PromptManager()
+        self.recordings = {}
+        self._payload_cache = {}
+        self._lock = threading.Lock()
+        # A local Ollama server handles one request at a time; serializing the calls keeps
+        # queueing behind other workers out of the measured latency
+        self._ollama_lock = threading.Lock()
+
+    def _payload(self, sample: Dict, config: EvaluationConfig) -> tuple[bytes, str]:
+        cache_key = (sample["image"], config.max_side, config.quality)
+        with self._lock:
+            if cache_key in self._payload_cache:
+                return self._payload_cache[cache_key]
+
+        with open(sample["image"], "rb") as f:
+            data = f.read()
+        if sample["image"].lower().endswith(".pdf"):
+            payload = data, "application/pdf"
+        else:
+            image = Image.open(io.BytesIO(data)).convert("RGB")
+            payload = ImageProcessor(None).image_to_base64(
+                image, max_side=config.max_side or None, quality=config.quality
+            )
+
+        with self._lock:
+            self._payload_cache[cache_key] = payload
+        return payload
+
+    def _prompt(self, sample: Dict, config: EvaluationConfig) -> str:
+        components = [self.prompt_manager.prompt_map[config.prompt_name]]
+        if config.prompt_name in DATED_PROMPTS:
+            date = datetime.date.fromisoformat(sample["date"])
+            components.append(DATED_PROMPTS[config.prompt_name](date))
+        return "\n\n".join(components)
+
+    def _run_one(self, sample: Dict, config: EvaluationConfig) -> Dict:
+        request_key = "|".join([*map(str, config), sample["name"]])
+        outcome = {
+            "config": config,
+            "payload": 0,
+            "expected": len(sample.get("events", [])),
+        }
+
+        try:
+            file_bytes, mime_type = self._payload(sample, config)
+            prompt = self._prompt(sample, config)
+            outcome["payload"] = len(file_bytes) + len(prompt.encode("utf-8"))
+
+            if self.replay is not None:
+                response, latency = self.replay.query(request_key)
+            elif config.backend == "ollama":
+                with self._ollama_lock:
+                    started = time.perf_counter()
+                    response = query_ollama(prompt, file_bytes, mime_type, config.model)
+                    latency = time.perf_counter() - started
+            else:
+                # Only the API call itself is timed, not the wait for quota
+                timing = {}
+                response = query_gemini(
+                    prompt,
+                    file_bytes,
+                    mime_type,
+                    session_id="evaluation",
+                    priority=BATCH,
+                    model_name=config.model,
+                    timing=timing,
+                )
+                latency = timing["latency"]
+
+            if self.replay is None:
+                with self._lock:
+                    self.recordings[request_key] = {
+                        "response": response,
+                        "latency": latency,
+                    }
+        except Exception as e:
+            print(f"⚠️ {config.label()} · {sample['name']}: {e}")
+            return {**outcome, "error": True, "predicted": 0, "true_positives": 0}
+
+        predicted = parse_response_events(response)
+        return {
+            **outcome,
+            "error": False,
+            "latency": latency,
+            "predicted": len(predicted),
+            "true_positives": match_events(
+                predicted, sample.get("events", []), self.tolerance_minutes
+            ),
+        }
+
+    def run(self) -> List[Dict]:
+        """
+        Evaluates all configurations on all samples in parallel.
+
+        Returns:
+            List[Dict]: One row per configuration with precision, recall, F1, latency percentiles,
+                        mean payload size, error count and Pareto flag, sorted by F1.
+        """
+        jobs = [(sample, config) for config in self.configs for sample in self.samples]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            outcomes = list(executor.map(lambda job: self._run_one(*job), jobs))
+
+        rows = []
+        for config in self.configs:
+            runs = [o for o in outcomes if o["config"] == config]
+            true_positives = sum(o["true_positives"] for o in runs)
+            predicted = sum(o["predicted"] for o in runs)
+            expected = sum(o["expected"] for o in runs)
+            precision = true_positives / predicted if predicted else 0.0
+            recall = true_positives / expected if expected else 0.0
+            successful = [o for o in runs if not o["error"]]
+            latencies = [o["latency"] for o in successful]
+            rows.append(
+                {
+                    "config": config.label(),
+                    "samples": len(runs),
+                    "errors": sum(o["error"] for o in runs),
+                    "precision": precision,
+                    "recall": recall,
+                    "f1": (
+                        2 * precision * recall / (precision + recall)
+                        if precision + recall
+                        else 0.0
+                    ),
+                    "p50": percentile(latencies, 50),
+                    "p95": percentile(latencies, 95),
+                    "payload": (
+                        sum(o["payload"] for o in successful) / len(successful)
+                        if successful
+                        else 0.0
+                    ),
+                }
+            )
+        pareto_front(rows)
+        return sorted(rows, key=lambda row: (-row["f1"], row["p50"]))
+
+
+def format_table(rows: List[Dict]) -> str:
+    """Formats the evaluation rows as a Markdown table."""
+    lines = [
+        "| Konfiguration | Precision | Recall | F1 | p50 (s) | p95 (s) | Payload (KB) | Fehler | Pareto |",
+        "|---|---|---|---|---|---|---|---|---|",
+    ]
+    for row in rows:
+        lines.append(
+            f"| {row['config']} | {row['precision']:.2f} | {row['recall']:.2f} | {row['f1']:.2f} "
+            f"| {row['p50']:.2f} | {row['p95']:.2f} | {row['payload'] / 1024:.0f} "
+            f"| {row['errors']}/{row['samples']} | {'✓' if row['pareto'] else ''} |"
+        )
+    return "\n".join(lines)
+
+
+def load_samples(manifest_path: str) -> List[Dict]:
+    """
+    Loads the labeled pages from the manifest and resolves their image paths.
+    The path relative to the manifest is kept as "name", so recordings stay unambiguous for
+    images with the same file name in different directories.
+    """
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        samples = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    for sample in samples:
+        sample["image"] = os.path.join(base_dir, sample["image"])
+        sample["name"] = os.path.relpath(sample["image"], base_dir).replace(os.sep, "/")
+    return samples
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(
+        description="Vergleicht Genauigkeit und Latenz von Backends, Modellen, Prompts und Bildauflösungen."
+    )
+    parser.add_argument(
+        "manifest", help="JSON-Datei mit Bildern und erwarteten Terminen"
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=["gemini", "ollama"],
+        default=["gemini", "ollama"],
+    )
+    parser.add_argument(
+        "--gemini-models",
+        nargs="+",
+        help=f"Standard: {GEMINI_MODEL} (bei --replay: alle aufgezeichneten Modelle)",
+    )
+    parser.add_argument(
+        "--ollama-models",
+        nargs="+",
+        help="Standard: alle installierten Modelle (bei --replay: alle aufgezeichneten Modelle)",
+    )
+    parser.add_argument(
+        "--prompts",
+        nargs="+",
+        default=["Calendar"],
+        choices=PromptManager().get_prompt_names(),
+    )
+    parser.add_argument(
+        "--max-sides",
+        nargs="+",
+        type=int,
+        default=[0],
+        help="Längste Bildseite in Pixeln, 0 = Original",
+    )
+    parser.add_argument(
+        "--qualities", nargs="+", type=int, default=[75], help="JPEG-Qualität"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=15, help="Erlaubte Zeitabweichung in Minuten"
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--min-f1",
+        type=float,
+        help="Empfiehlt die schnellste Konfiguration mit mindestens diesem F1",
+    )
+    parser.add_argument(
+        "--replay",
+        help="Aufgezeichnete Antworten statt echter Backend-Aufrufe verwenden",
+    )
+    parser.add_argument(
+        "--record", help="Antworten und Latenzen für spätere Replays speichern"
+    )
+    parser.add_argument("--output", help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    replay = ReplayBackend(args.replay) if args.replay else None
+
+    models = {"gemini": args.gemini_models, "ollama": args.ollama_models}
+    if "gemini" in args.backends and replay is None:
+        import google.generativeai as genai
+
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    if "gemini" in args.backends and not models["gemini"]:
+        models["gemini"] = (
+            replay.models("gemini") if replay is not None else [GEMINI_MODEL]
+        )
+    if "ollama" in args.backends and not models["ollama"]:
+        if replay is not None:
+            models["ollama"] = replay.models("ollama")
+        else:
+            import ollama
+
+            models["ollama"] = [m["model"] for m in ollama.list().get("models", [])]
+
+    configs = [
+        EvaluationConfig(backend, model, prompt_name, max_side, quality)
+        for backend in args.backends
+        for model in models[backend]
+        for prompt_name in args.prompts
+        for max_side in args.max_sides
+        for quality in args.qualities
+    ]
+
+    evaluator = BackendEvaluator(
+        load_samples(args.manifest),
+        configs,
+        tolerance_minutes=args.tolerance,
+        workers=args.workers,
+        replay=replay,
+    )
+    rows = evaluator.run()
+    print(format_table(rows))
+
+    if args.min_f1 is not None:
+        accurate = [
+            row for row in rows if row["f1"] >= args.min_f1 and row["errors"] == 0
+        ]
+        if accurate:
+            best = min(accurate, key=lambda row: row["p50"])
+            print(
+                f"\nEmpfehlung: {best['config']} (F1 {best['f1']:.2f}, p50 {best['p50']:.2f}s)"
+            )
+        else:
+            print(f"\nKeine Konfiguration erreicht F1 ≥ {args.min_f1}.")
+
+    if args.record:
+        with open(args.record, "w", encoding="utf-8") as f:
+            json.dump(evaluator.recordings, f, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,208 @@
 import json
+import uuid
+import hashlib
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
 import streamlit as st
 from lib.backend.ollama_backend import query_ollama
 from lib.backend.gemini_backend import query_gemini
+from lib.backend.request_scheduler import BATCH, INTERACTIVE, get_gemini_scheduler
 from lib.models.calendar_event import EventManager
 
+# Shared worker pool for speculative extractions of all sessions
+_speculation_executor = ThreadPoolExecutor(
+    max_workers=4, thread_name_prefix="speculative_extraction"
+)
+
+
+class SpeculativeExtraction:
+    """
+    A background extraction started right after upload, before the user confirms the prompt.
+
+    Args:
+        request_key (tuple): File digest, MIME type, prompt, backend and model the extraction was started with.
+        future (Future): The running backend request.
+        cancel_event (threading.Event): Set to cancel the request while it waits for a free slot.
+        sent_event (threading.Event): Set once the request has been sent to the backend.
+    """
+
+    def __init__(
+        self,
+        request_key: tuple,
+        future,
+        cancel_event: threading.Event,
+        sent_event: threading.Event,
+    ):
+        self.request_key = request_key
+        self.future = future
+        self.cancel_event = cancel_event
+        self.sent_event = sent_event
+        self.discarded = False
+
+    @property
+    def file_digest(self) -> str:
+        return self.request_key[0]
+
+    def discard(self):
+        """Cancels the request if it has not been sent yet and marks its result as unusable."""
+        self.discarded = True
+        self.cancel_event.set()
+        self.future.cancel()
+        # Let the request leave the quota queue right away instead of after the next poll
+        get_gemini_scheduler().wake()
+
+
+def get_session_id(key: str = "session_id") -> str:
+    """
+    Returns a stable identifier of the current browser session, used for fair scheduling
+    of backend requests. The identifier is created on first use.
+    """
+    return st.session_state.setdefault(key, uuid.uuid4().hex)
+
+
+def _request_key(ollama_model: str = None) -> tuple:
+    return (
+        hashlib.sha256(st.session_state["file_bytes"]).hexdigest(),
+        st.session_state["mime_type"],
+        st.session_state.get("final_prompt", ""),
+        st.session_state["backend"],
+        ollama_model if st.session_state["backend"] == "Ollama (Local)" else None,
+    )
+
+
+def _query_backend(
+    prompt: str,
+    file_bytes: bytes,
+    mime_type: str,
+    backend: str,
+    ollama_model: str = None,
+    session_id: str = "default",
+    priority: int = INTERACTIVE,
+    cancel_event: threading.Event = None,
+    sent_event: threading.Event = None,
+) -> str:
+    if backend == "Ollama (Local)":
+        if cancel_event is not None and cancel_event.is_set():
+            raise CancelledError()
+        if sent_event is not None:
+            sent_event.set()
+        return query_ollama(prompt, file_bytes, mime_type, ollama_model)
+    return query_gemini(
+        prompt,
+        file_bytes,
+        mime_type,
+        session_id=session_id,
+        priority=priority,
+        cancel_event=cancel_event,
+        admitted_event=sent_event,
+    )
+
+
+def start_speculative_extraction(ollama_model: str = None, key: str = "speculation"):
+    """
+    Starts the extraction of a newly uploaded file in the background with the current
+    (default Calendar) prompt, so the result may already be available when the user clicks
+    "Handschrift lesen".
+
+    Only one speculative extraction is started per uploaded file. If the prompt, date, backend
+    or model changes afterwards, the extraction is cancelled or its result discarded.
+    Speculation is limited to Gemini: a running Ollama request cannot be aborted, so a
+    discarded extraction would block the local server for the real request.
+
+    Args:
+        ollama_model (str, optional): Model name for Ollama backend. Required if using Ollama.
+        key (str, optional): The session state key under which the speculation is stored. Defaults to "speculation".
+    """
+    if not all(st.session_state.get(k) for k in ["file_bytes", "mime_type"]):
+        return
+
+    request_key = _request_key(ollama_model)
+    speculation = st.session_state.get(key)
+
+    if speculation is not None and speculation.file_digest == request_key[0]:
+        if speculation.request_key != request_key and not speculation.discarded:
+            speculation.discard()
+        return
+
+    if speculation is not None:
+        speculation.discard()
+        st.session_state.pop(key)
+
+    if (
+        st.session_state.get("prompt_name") != "Calendar"
+        or st.session_state["backend"] == "Ollama (Local)"
+    ):
+        return
+
+    cancel_event = threading.Event()
+    sent_event = threading.Event()
+    future = _speculation_executor.submit(
+        _query_backend,
+        st.session_state["final_prompt"],
+        st.session_state["file_bytes"],
+        st.session_state["mime_type"],
+        st.session_state["backend"],
+        ollama_model,
+        session_id=get_session_id(),
+        priority=BATCH,
+        cancel_event=cancel_event,
+        sent_event=sent_event,
+    )
+    st.session_state[key] = SpeculativeExtraction(
+        request_key, future, cancel_event, sent_event
+    )
+
+
+def take_speculative_result(ollama_model: str = None, key: str = "speculation"):
+    """
+    Returns the result of the speculative extraction if it was started with exactly the
+    current file, prompt, backend and model. Waits for the request if it has already been sent.
+    A speculation still waiting for quota (with BATCH priority) is cancelled instead,
+    so the click is answered by a fresh INTERACTIVE request.
+
+    Args:
+        ollama_model (str, optional): Model name for Ollama backend.
+        key (str, optional): The session state key of the speculation. Defaults to "speculation".
+
+    Returns:
+        str: The model response, or None if no matching speculative extraction is available.
+    """
+    speculation = st.session_state.get(key)
+    if speculation is None or speculation.discarded:
+        return None
+    if speculation.request_key != _request_key(ollama_model) or (
+        not speculation.sent_event.is_set()
+    ):
+        speculation.discard()
+        return None
+
+    # A result is only used once; a repeated click queries the backend again
+    speculation.discarded = True
+    try:
+        return speculation.future.result()
+    except Exception:
+        return None
+
 
 def process_calendar_extraction(ollama_model: str = None, key: str = "result"):
     """
     Processes the uploaded file and prompt using the selected backend (Ollama or Gemini),
     extracts event data in JSON format, and updates Streamlit session state.
 
+    A matching speculative extraction started on upload is reused instead of sending a new request.
+
     Args:
         backend (str): Either "Ollama (Local)" or another backend identifier (e.g., "Gemini").
         ollama_model (str, optional): Model name for Ollama backend. Required if using Ollama.
     """
     try:
-        # Choose backend
-        result = (
-            query_ollama(
-                st.session_state["final_prompt"],
-                st.session_state["file_bytes"],
-                st.session_state["mime_type"],
-                ollama_model,
-            )
-            if st.session_state["backend"] == "Ollama (Local)"
-            else query_gemini(
-                st.session_state["final_prompt"],
-                st.session_state["file_bytes"],
-                st.session_state["mime_type"],
-            )
+        result = take_speculative_result(ollama_model) or _query_backend(
+            st.session_state["final_prompt"],
+            st.session_state["file_bytes"],
+            st.session_state["mime_type"],
+            st.session_state["backend"],
+            ollama_model,
+            session_id=get_session_id(),
         )
 
         if result:
@@ -2,6 +2,19 @@ import datetime
 import streamlit as st
 
 
+def format_date_prompt(date: datetime.date) -> str:
+    """
+    Formats the prompt component that tells the model which day the planner page belongs to.
+
+    Args:
+        date (datetime.date): The date of the planner page.
+
+    Returns:
+        str: The date component of the prompt.
+    """
+    return "\nDatum des Termins: " + date.strftime("%Y-%m-%d") + " (Europe/Berlin)"
+
+
 def select_event_date(key: str = "date"):
     """
     Allows the user to select a date for an event from a list of the next 7 days.
@@ -21,8 +34,59 @@ def select_event_date(key: str = "date"):
         format_func=lambda i: date_labels[i],
         index=1,
     )
-    st.session_state[key] = (
-        "\nDatum des Termins: "
-        + dates[date_index].strftime("%Y-%m-%d")
-        + " (Europe/Berlin)"
+    st.session_state[key] = format_date_prompt(dates[date_index])
+
+
+def format_week_prompt(week_start: datetime.date) -> str:
+    """
+    Formats the prompt component that maps the seven columns of a week spread to their dates.
+
+    Args:
+        week_start (datetime.date): The Monday of the planner week.
+
+    Returns:
+        str: The week component of the prompt.
+    """
+    days = [week_start + datetime.timedelta(days=i) for i in range(7)]
+    columns = "\n".join(
+        f"- Spalte {i + 1}: {d.strftime('%A')}, {d.strftime('%Y-%m-%d')}"
+        for i, d in enumerate(days)
+    )
+    return (
+        f"\nWoche der Termine: {days[0].strftime('%Y-%m-%d')} bis {days[-1].strftime('%Y-%m-%d')}"
+        " (Europe/Berlin)\n"
+        "Die Spalten von links nach rechts entsprechen diesen Tagen:\n" + columns
+    )
+
+
+def select_event_week(key: str = "date", week_key: str = "week_start"):
+    """
+    Allows the user to select the week of a week-at-a-glance planner spread,
+    from last week up to three weeks ahead.
+
+    This function renders a select box for the user to choose a week. It then stores the prompt
+    component mapping each column to its date, as well as the Monday of the selected week,
+    in the session state.
+
+    Args:
+        key (str, optional): The key for the session state to store the week prompt component. Defaults to "date".
+        week_key (str, optional): The key for the session state to store the Monday of the week. Defaults to "week_start".
+    """
+    today = datetime.date.today()
+    this_monday = today - datetime.timedelta(days=today.weekday())
+    weeks = [this_monday + datetime.timedelta(weeks=i) for i in range(-1, 4)]
+    week_names = ["Letzte Woche", "Diese Woche", "Nächste Woche"] + [
+        f"KW {w.isocalendar().week}" for w in weeks[3:]
+    ]
+    week_labels = [
+        f"{name} ({w.strftime('%d.%m.')} – {(w + datetime.timedelta(days=6)).strftime('%d.%m.')})"
+        for name, w in zip(week_names, weeks)
+    ]
+    week_index = st.selectbox(
+        "Für welche Woche ist das?",
+        range(len(week_labels)),
+        format_func=lambda i: week_labels[i],
+        index=1,
     )
+    st.session_state[week_key] = weeks[week_index]
+    st.session_state[key] = format_week_prompt(weeks[week_index])
@@ -5,11 +5,14 @@ from PIL import Image
 from dotenv import load_dotenv
 import google.generativeai as genai
 from lib.config.prompt_manager import PromptManager
-from lib.utils.select_date import select_event_date
+from lib.utils.select_date import select_event_date, select_event_week
 import locale
 import datetime
 from lib.models.image import ImageProcessor
-from lib.utils.process_calendar_extraction import process_calendar_extraction
+from lib.utils.process_calendar_extraction import (
+    process_calendar_extraction,
+    start_speculative_extraction,
+)
 from lib.models.calendar_event import EventManager
 import json
 
@@ -64,6 +67,15 @@ with col1:
         except Exception as e:
             st.error(f"Fehler beim Abrufen der Ollama-Modelle: {e}")
 
+    st.checkbox(
+        "⚡ Schon beim Hochladen mit dem Lesen beginnen",
+        key="speculative_extraction",
+        help="Startet die Erkennung mit dem Standard-Prompt direkt nach dem Hochladen. "
+        "Ändern sich Prompt, Datum oder Modell, wird das Ergebnis verworfen. "
+        "Nur mit Gemini: Ollama verarbeitet eine Anfrage nach der anderen und könnte "
+        "eine verworfene Erkennung nicht abbrechen.",
+    )
+
 with col2:
     # Initialize standard prompt once
     if "prompt_name" not in st.session_state:
@@ -87,11 +99,17 @@ with col2:
 
     if st.session_state["prompt_name"] in ["Calendar"]:
         select_event_date()
+    elif st.session_state["prompt_name"] in ["Week Planner"]:
+        select_event_week()
 
     if st.session_state["prompt_name"] != "Custom":
         prompt_manager.merge_prompt_components(
             ["prompt"]
-            + (["date"] if st.session_state["prompt_name"] in ["Calendar"] else [])
+            + (
+                ["date"]
+                if st.session_state["prompt_name"] in ["Calendar", "Week Planner"]
+                else []
+            )
         )
 
 
@@ -109,6 +127,11 @@ with st.expander("🔧 Prompt ändern", expanded=False):
         key="final_prompt",
         on_change=on_prompt_text_change,
     )
+
+# Start reading the upload in the background while the user reviews the form
+if st.session_state.get("speculative_extraction"):
+    start_speculative_extraction(ollama_model)
+
 if (
     st.session_state["backend"] == "Ollama (Local)"
     and st.session_state.get("mime_type") == "application/pdf"
@@ -134,11 +157,17 @@ if all(st.session_state.get(k) for k in ["file_bytes", "mime_type"]) and st.butt
 # Editierbare Blöcke für Einträge
 if "result" in st.session_state and st.session_state["prompt_name"] in [
     "Calendar",
+    "Week Planner",
 ]:
 
     event_manager = EventManager(st.session_state["result"])
+    invalid_events = None
+    if st.session_state["prompt_name"] == "Week Planner":
+        invalid_events = event_manager.render_week_validation(
+            st.session_state["week_start"]
+        )
     event_manager.render_editable_event_blocks()
-    event_manager.render_upload_button()
+    event_manager.render_upload_button(invalid=invalid_events)
     # event_manager.render_json_block()
 
     # Final JSON output
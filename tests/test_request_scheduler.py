@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+
+from lib.backend.request_scheduler import RequestCancelled, RequestScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.lock = threading.Lock()
+
+    def __call__(self) -> float:
+        with self.lock:
+            return self.now
+
+    def advance(self, seconds: float):
+        with self.lock:
+            self.now += seconds
+
+
+def run_requests(scheduler, clock, count, tokens=0, seconds=300):
+    admitted = []
+    lock = threading.Lock()
+
+    def request():
+        with lock:
+            admitted.append(clock())
+        return "ok"
+
+    threads = [
+        threading.Thread(
+            target=scheduler.run,
+            args=(request,),
+            kwargs={"session_id": f"session-{i % 3}", "tokens": tokens},
+            daemon=True,
+        )
+        for i in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    for _ in range(seconds):
+        if len(admitted) == count:
+            break
+        time.sleep(0.01)
+        clock.advance(1)
+        scheduler.wake()
+    for thread in threads:
+        thread.join(timeout=5)
+    return sorted(admitted)
+
+
+def max_per_window(admitted, period=60):
+    return max(
+        sum(1 for other in admitted if start <= other < start + period)
+        for start in admitted
+    )
+
+
+def test_requests_per_minute_hold_in_every_window():
+    clock = FakeClock()
+    scheduler = RequestScheduler(10, 1_000_000, clock=clock, poll_interval=0.001)
+
+    admitted = run_requests(scheduler, clock, count=30)
+
+    assert len(admitted) == 30
+    assert max_per_window(admitted) <= 10
+
+
+def test_tokens_per_minute_hold_in_every_window():
+    clock = FakeClock()
+    scheduler = RequestScheduler(100, 10_000, clock=clock, poll_interval=0.001)
+
+    admitted = run_requests(scheduler, clock, count=12, tokens=3_000)
+
+    assert len(admitted) == 12
+    assert max_per_window(admitted) <= 3
+
+
+def test_corrected_usage_is_charged():
+    clock = FakeClock()
+    scheduler = RequestScheduler(100, 10_000, clock=clock, poll_interval=0.001)
+
+    scheduler.run(lambda: 9_000, tokens=1_000, actual_tokens=lambda used: used)
+
+    assert scheduler.token_limit.wait_time(2_000) == pytest.approx(60)
+
+
+def test_cancelled_waiter_leaves_immediately_after_wake():
+    clock = FakeClock()
+    scheduler = RequestScheduler(1, 1_000_000, clock=clock, poll_interval=60)
+    scheduler.acquire()
+    cancel_event = threading.Event()
+    errors = []
+
+    def wait():
+        try:
+            scheduler.acquire(cancel_event=cancel_event)
+        except RequestCancelled as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=wait, daemon=True)
+    thread.start()
+    while scheduler.pending() == 0:
+        time.sleep(0.001)
+    cancel_event.set()
+    scheduler.wake()
+    thread.join(timeout=5)
+
+    assert errors and scheduler.pending() == 0